@@ -2,7 +2,9 @@
 compared to the Python's built-in JSON library.
 
 It compares the time and memory usage of the two libraries when loading a JSON
-file.
+file. `ijson` is also benchmarked as a streaming pure Python baseline, as
+`json.load` has to build the whole document in memory before it can be
+iterated over.
 """
 
 import asyncio
@@ -11,7 +13,9 @@ import os
 import resource
 import timeit
 
-from json_lineage import aload, load
+import ijson
+
+from json_lineage import aload, load, load_batched
 
 FP = os.path.join(
     os.path.dirname(os.path.realpath(__file__)),
@@ -27,11 +31,29 @@ def using_rust_lib():
         i
 
 
-def using_python_lib():
-    for i in json.load(open(FP)):
+def using_rust_lib_raw():
+    for i in load(FP, raw=True):
         i
 
 
+def using_rust_lib_batched():
+    for batch in load_batched(FP):
+        for i in batch:
+            i
+
+
+def using_python_lib():
+    with open(FP) as f:
+        for i in json.load(f):
+            i
+
+
+def using_python_streaming():
+    with open(FP, "rb") as f:
+        for i in ijson.items(f, "item"):
+            i
+
+
 async def using_rust_lib_async():
     async for i in aload(FP):
         i
@@ -55,5 +77,10 @@ def benchmark(fn):
 
 if __name__ == "__main__":
     rs_time, rs_mem = benchmark(using_rust_lib)
+    benchmark(using_rust_lib_raw)
+    benchmark(using_rust_lib_batched)
+    benchmark(using_python_streaming)
+    # `ru_maxrss` is a high-water mark, so `json.load` has to run last for the
+    # memory usage of the other benchmarks to be measured.
     py_time, py_mem = benchmark(using_python_lib)
     print(f"{py_time}|{rs_time}|{py_mem}|{rs_mem}")
@@ -0,0 +1,5 @@
+import typing as _t
+
+class LineReader:
+    def __init__(self, stream: _t.BinaryIO, size: int = ...) -> None: ...
+    def next_line(self) -> _t.Optional[bytes]: ...
@@ -0,0 +1,87 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""C implementation of the line splitter used by `BinaryIterator`.
+
+This module is optional. When it has not been built, `bin_interface` falls
+back to the pure Python `_LineReader` which behaves identically.
+"""
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from libc.stdlib cimport free, malloc, realloc
+from libc.string cimport memchr, memmove
+
+
+cdef class LineReader:
+    """Splits the lines of a binary stream out of chunks read straight into
+    a C buffer.
+    """
+
+    cdef object _readinto
+    cdef char* buf
+    cdef Py_ssize_t len
+    cdef Py_ssize_t cap
+    cdef Py_ssize_t pos
+    cdef bint eof
+
+    def __cinit__(self, stream, Py_ssize_t size=1 << 16):
+        self.buf = <char*>malloc(size)
+        if self.buf == NULL:
+            raise MemoryError()
+        self.cap = size
+        self.len = 0
+        self.pos = 0
+        self.eof = False
+        self._readinto = stream.readinto1
+
+    def __dealloc__(self):
+        free(self.buf)
+
+    cdef int _fill(self) except -1:
+        cdef Py_ssize_t remaining = self.len - self.pos
+        cdef char* new_buf
+        cdef char[::1] view
+        cdef object n
+
+        if self.pos:
+            memmove(self.buf, self.buf + self.pos, remaining)
+            self.len = remaining
+            self.pos = 0
+        if self.len == self.cap:
+            new_buf = <char*>realloc(self.buf, self.cap * 2)
+            if new_buf == NULL:
+                raise MemoryError()
+            self.buf = new_buf
+            self.cap *= 2
+
+        view = <char[:self.cap - self.len]>(self.buf + self.len)
+        n = self._readinto(view)
+        if not n:
+            self.eof = True
+        else:
+            self.len += <Py_ssize_t>n
+        return 0
+
+    cpdef bytes next_line(self):
+        """Return the next line without its line ending, or `None` once the
+        stream is exhausted.
+        """
+        cdef char* start
+        cdef char* nl
+        cdef Py_ssize_t size
+        cdef bytes line
+
+        while True:
+            start = self.buf + self.pos
+            nl = <char*>memchr(start, b"\n", self.len - self.pos)
+            if nl != NULL:
+                size = nl - start
+                self.pos += size + 1
+                return PyBytes_FromStringAndSize(start, size)
+            if self.eof:
+                break
+            self._fill()
+
+        line = PyBytes_FromStringAndSize(
+            self.buf + self.pos, self.len - self.pos
+        )
+        self.pos = self.len
+        return line if line else None
@@ -1,35 +1,84 @@
 import asyncio
+import collections
+import functools
 import json
 import os
-import platform
 import subprocess
+import sys
+import threading
 import typing as _t
 from collections.abc import Awaitable, Coroutine
 
 from .exceptions import BinaryExecutionException
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
 __all__ = [
     "BinaryReader",
+    "BatchedBinaryReader",
     "AsyncBinaryReader",
 ]
 
-
+# Number of bytes to request from the binary's stdout per read. Lines are
+# split out of these chunks in memory rather than read one at a time.
+_READ_SIZE = 1 << 16
+# Buffer size for the pipes connected to the binary.
+_PIPE_BUFSIZE = 1 << 20
+# `fcntl` only exposes `F_SETPIPE_SZ` from Python 3.10, but the operation is
+# available on any Linux kernel since 2.6.35.
+_F_SETPIPE_SZ = (
+    getattr(fcntl, "F_SETPIPE_SZ", 1031)
+    if fcntl is not None and sys.platform.startswith("linux")
+    else None
+)
+# Maximum number of bytes of the binary's stderr to keep for error messages.
+_STDERR_LIMIT = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
 def get_bin_path() -> str:
-    """Get the path to the jsonl_converter binary."""
+    """Get the path to the jsonl_converter binary. The result is cached as
+    the binary's location can't change while the program is running.
+    """
     bin_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "bin")
-    if platform.system() == "Windows":
+    if sys.platform == "win32":
         return os.path.join(bin_dir, "jsonl_converter.exe")
     else:
         return os.path.join(bin_dir, "jsonl_converter")
 
 
+def _grow_pipe(pipe: _t.Any) -> None:
+    """Enlarge the kernel buffer of `pipe` to `_PIPE_BUFSIZE` where
+    supported, so that the binary and the reader wake each other up less
+    often. Failures are ignored as the default size still works.
+    """
+    if _F_SETPIPE_SZ is None or pipe is None:
+        return
+    try:
+        fcntl.fcntl(pipe.fileno(), _F_SETPIPE_SZ, _PIPE_BUFSIZE)
+    except (OSError, ValueError):
+        # Most likely above /proc/sys/fs/pipe-max-size.
+        pass
+
+
 class BaseBinaryReader:
     """Base class for the `BinaryReader` and `AsyncBinaryReader` classes."""
 
-    def __init__(self, filepath: str, messy: bool = False):
+    def __init__(
+        self,
+        filepath: _t.Union[str, os.PathLike],
+        messy: bool = False,
+        *,
+        raw: bool = False,
+    ):
         self.bin_path = get_bin_path()
-        self.file_path = filepath
+        # Converted once here rather than by `subprocess` on every run.
+        self.file_path = os.fspath(filepath)
         self.messy = messy
+        self.raw = raw
         self._proc: _t.Optional[
             _t.Union[subprocess.Popen, asyncio.subprocess.Process]
         ] = None
@@ -52,15 +101,21 @@ class BaseBinaryReader:
         if self._proc is None:
             return
 
-        for stream in ("stdout", "stderr"):
-            stream = getattr(self._proc, stream)
-            if hasattr(stream, "close"):
-                stream.close()
-
+        # Terminate before closing the streams so that any thread still
+        # draining them sees EOF rather than holding up `close`.
         try:
             self._proc.terminate()
         except ProcessLookupError:
             pass
+
+        # asyncio's stream readers can't be closed, their pipes are closed by
+        # the transport once the process exits.
+        if not isinstance(self._proc, asyncio.subprocess.Process):
+            if self._proc.stdout:
+                self._proc.stdout.close()
+            if self._proc.stderr:
+                self._proc.stderr.close()
+
         self._proc = None
 
 
@@ -68,7 +123,7 @@ class BinaryReader(BaseBinaryReader):
     """Subprocess wrapper for the jsonl_converter binary."""
 
     def __iter__(self):
-        return BinaryIterator(self.popen())
+        return BinaryIterator(self.popen(), raw=self.raw)
 
     def popen(self) -> subprocess.Popen:
         """Run the binary and return a Popen object."""
@@ -76,48 +131,291 @@ class BinaryReader(BaseBinaryReader):
             self.bin_args(),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True,
+            bufsize=_PIPE_BUFSIZE,
         )
+        _grow_pipe(self._proc.stdout)
+        _grow_pipe(self._proc.stderr)
         return self._proc
 
 
+class BatchedBinaryReader(BinaryReader):
+    """Subprocess wrapper for the jsonl_converter binary which yields lists
+    of up to `batch_size` objects at a time rather than one by one.
+    """
+
+    def __init__(
+        self,
+        filepath: _t.Union[str, os.PathLike],
+        messy: bool = False,
+        *,
+        raw: bool = False,
+        batch_size: int = 1024,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        super().__init__(filepath, messy, raw=raw)
+        self.batch_size = batch_size
+
+    def __iter__(self) -> _t.Iterator[_t.List[_t.Any]]:
+        return self._batches(BinaryIterator(self.popen(), raw=True))
+
+    def _batches(
+        self,
+        iterator: "BinaryIterator",
+    ) -> _t.Iterator[_t.List[_t.Any]]:
+        readline = iterator.readline
+        batch_size = self.batch_size
+        raw = self.raw
+        while True:
+            batch: _t.List[bytes] = []
+            append = batch.append
+            for _ in range(batch_size):
+                line = readline()
+                if line is None:
+                    break
+                append(line)
+
+            if batch:
+                yield batch if raw else list(map(json.loads, batch))
+            if len(batch) < batch_size:
+                return
+
+
+def _split_chunk(pending: _t.List[bytes], chunk: bytes) -> _t.List[bytes]:
+    """Return the lines completed by `chunk`. The start of a line that is
+    still unfinished is kept in `pending` and only joined once its end
+    arrives, so a line spanning many chunks is copied once rather than once
+    per chunk.
+    """
+    lines = chunk.split(b"\n")
+    if len(lines) == 1:
+        pending.append(chunk)
+        return []
+
+    if pending:
+        pending.append(lines[0])
+        lines[0] = b"".join(pending)
+        pending.clear()
+    tail = lines.pop()
+    if tail:
+        pending.append(tail)
+    return lines
+
+
+class _LineReader:
+    """Pure Python fallback for `json_lineage._fastline.LineReader`. Reads
+    the stream in chunks of `_READ_SIZE` bytes and splits each chunk into
+    lines in one go, rather than calling `readline` on the stream for every
+    line.
+    """
+
+    def __init__(self, stream: _t.BinaryIO):
+        self._read = stream.read1  # type: ignore[attr-defined]
+        self._lines: _t.Deque[bytes] = collections.deque()
+        self._pending: _t.List[bytes] = []
+
+    def next_line(self) -> _t.Optional[bytes]:
+        """Return the next line without its line ending, or `None` once the
+        stream is exhausted.
+        """
+        lines = self._lines
+        if lines:
+            return lines.popleft()
+
+        while True:
+            chunk = self._read(_READ_SIZE)
+            if not chunk:
+                if not self._pending:
+                    return None
+                line = b"".join(self._pending)
+                self._pending.clear()
+                return line
+
+            parts = _split_chunk(self._pending, chunk)
+            if parts:
+                lines.extend(parts)
+                return lines.popleft()
+
+
+try:
+    from ._fastline import LineReader
+except ImportError:
+    LineReader = _LineReader  # type: ignore[misc, assignment]
+
+
+class _StderrDrain:
+    """Reads a stream on a background thread until it is exhausted, so that
+    the binary can never block on a full stderr pipe while its stdout is
+    being consumed. Only the first `_STDERR_LIMIT` bytes are kept, and are
+    decoded for use in error messages.
+    """
+
+    def __init__(self, stream: _t.BinaryIO):
+        self._stream = stream
+        self._data = bytearray()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        read = self._stream.read1  # type: ignore[attr-defined]
+        data = self._data
+        try:
+            while True:
+                chunk = read(4096)
+                if not chunk:
+                    break
+                if len(data) < _STDERR_LIMIT:
+                    data += chunk[: _STDERR_LIMIT - len(data)]
+        except (OSError, ValueError):
+            # The stream was closed under us, i.e. the process was killed.
+            pass
+
+    def read(self) -> str:
+        """Wait for the stream to be exhausted and return what was read."""
+        self._thread.join()
+        return self._data.decode(errors="replace")
+
+
+async def _drain_stderr(stream: asyncio.StreamReader) -> str:
+    """Async counterpart to `_StderrDrain`. Reads `stream` until it is
+    exhausted and returns the first `_STDERR_LIMIT` bytes decoded.
+    """
+    data = bytearray()
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            return data.decode(errors="replace")
+        if len(data) < _STDERR_LIMIT:
+            data += chunk[: _STDERR_LIMIT - len(data)]
+
+
 class BinaryIterator:
-    """Iterator for the `BinaryReader` class."""
+    """Iterator for the `BinaryReader` class.
+
+    Each line is decoded as JSON, unless `raw` is set in which case the lines
+    are returned as `bytes` without being decoded.
+    """
 
-    def __init__(self, process: subprocess.Popen):
+    def __init__(self, process: subprocess.Popen, raw: bool = False):
         self.process = process
+        self.raw = raw
+        stdout = getattr(process, "stdout", None)
+        self._lines = None if stdout is None else LineReader(stdout)
+        stderr = getattr(process, "stderr", None)
+        self._stderr = None if stderr is None else _StderrDrain(stderr)
 
     def __iter__(self):
         return self
 
-    def __next__(self) -> str:
-        self.raise_err_if_stderr()
-
-        if self.process.stdout is None:
-            raise StopIteration
-        line = self.process.stdout.readline().strip()
-        self.raise_err_if_stderr()
-        if not line and self.process.poll() is not None:
+    def __next__(self) -> _t.Any:
+        line = self.readline()
+        if line is None:
             raise StopIteration
 
+        if self.raw:
+            return line
         return json.loads(line)
 
+    def readline(self) -> _t.Optional[bytes]:
+        """Return the next line from the binary's stdout, or `None` once the
+        output is exhausted. The exit status of the binary is only checked
+        once its output is exhausted.
+        """
+        if self._lines is None:
+            return None
+
+        line = self._lines.next_line()
+        if line is None:
+            self.process.wait()
+            self.raise_err_if_stderr()
+        return line
+
     def raise_err_if_stderr(self) -> None:
         """Raise an exception if the process has exited with a non-zero
         code.
         """
-        if self.process.poll() is not None and self.process.poll() != 0:
-            if self.process.stderr is None:
-                raise BinaryExecutionException(
-                    f"Process exited with code {self.process.poll()}"
-                )
-            else:
-                raise BinaryExecutionException(self.process.stderr.read())
+        returncode = self.process.poll()
+        if returncode is not None and returncode != 0:
+            err = self._stderr.read() if self._stderr is not None else ""
+            raise BinaryExecutionException(
+                err or f"Process exited with code {returncode}"
+            )
 
 
-class AsyncBinaryReader(BaseBinaryReader):
+def _pop_line(buf: bytearray, start: int = 0) -> _t.Optional[bytes]:
+    """Remove the first complete line from `buf` and return it without its
+    line ending, or return `None` if `buf` holds no complete line. Only the
+    bytes from `start` onwards are searched for the line ending.
+    """
+    idx = buf.find(b"\n", start)
+    if idx < 0:
+        return None
+    line = bytes(buf[:idx])
+    del buf[: idx + 1]
+    return line
+
+
+async def _read_line(
+    stream: asyncio.StreamReader,
+    buf: bytearray,
+) -> _t.Optional[bytes]:
+    """Return the next line from `stream`, using `buf` to hold any data read
+    beyond the end of the line. `None` is returned once the stream is
+    exhausted.
+    """
+    # Only the bytes added since the last search can contain a new line.
+    start = 0
+    while True:
+        line = _pop_line(buf, start)
+        if line is not None:
+            return line
+
+        start = len(buf)
+        chunk = await stream.read(_READ_SIZE)
+        if not chunk:
+            if not buf:
+                return None
+            line = bytes(buf)
+            buf.clear()
+            return line
+        buf += chunk
+
+
+class AsyncLineReaderMixin:
+    """Reads the lines of an async process' stdout through the `_buf`
+    buffer. Shared by `AsyncBinaryReader` and `AsyncBinaryIterator`.
+    """
+
+    _buf: bytearray
+
+    async def read_line(self, process: asyncio.subprocess.Process) -> bytes:
+        """Return the next line from the process' stdout as `bytes`, or an
+        empty bytes object once it is exhausted.
+        """
+        if process.stdout is None:
+            return b""
+        return await _read_line(process.stdout, self._buf) or b""
+
+    async def read_output(self, process: asyncio.subprocess.Process) -> str:
+        """Return the next line from the process' stdout as a string, or an
+        empty string once it is exhausted.
+        """
+        return (await self.read_line(process)).decode()
+
+
+class AsyncBinaryReader(AsyncLineReaderMixin, BaseBinaryReader):
     """Async subprocess wrapper for the jsonl_converter binary."""
 
+    def __init__(
+        self,
+        filepath: _t.Union[str, os.PathLike],
+        messy: bool = False,
+        *,
+        raw: bool = False,
+    ):
+        super().__init__(filepath, messy, raw=raw)
+        self._buf = bytearray()
+
     async def popen(self) -> asyncio.subprocess.Process:
         """Run the binary and return a Popen object."""
 
@@ -125,62 +423,120 @@ class AsyncBinaryReader(BaseBinaryReader):
             *self.bin_args(),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            # The stream readers pause reading once they buffer twice this
+            # many bytes, so it is raised from 64 KiB to match the pipes.
+            limit=_PIPE_BUFSIZE,
         )
+        # asyncio doesn't expose the underlying pipes publicly, so they are
+        # reached through the subprocess transport.
+        transport = getattr(self._proc, "_transport", None)
+        if transport is not None:
+            for fd in (1, 2):
+                pipe_transport = transport.get_pipe_transport(fd)
+                if pipe_transport is not None:
+                    _grow_pipe(pipe_transport.get_extra_info("pipe"))
+        self._buf = bytearray()
         return self._proc
 
-    async def read_output(self, process: asyncio.subprocess.Process) -> str:
-        if process.stdout is None:
-            return ""
-
-        line = await process.stdout.readline()
-        if not line:
-            return ""
-
-        return line.decode().rstrip()
-
     def __aiter__(self):
-        return AsyncBinaryIterator(self.popen())
+        return AsyncBinaryIterator(self.popen(), raw=self.raw)
 
+    def batched(self, n: int = 1024) -> _t.AsyncIterator[_t.List[_t.Any]]:
+        """Iterate over lists of up to `n` objects at a time. Each read from
+        the binary's stdout is split into lines in one go, so there is one
+        `await` per batch rather than per object.
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        return self._batched(n)
+
+    async def _batched(self, n: int) -> _t.AsyncIterator[_t.List[_t.Any]]:
+        process = await self.popen()
+        stdout = _t.cast(asyncio.StreamReader, process.stdout)
+        stderr = asyncio.ensure_future(
+            _drain_stderr(_t.cast(asyncio.StreamReader, process.stderr))
+        )
+        raw = self.raw
+        pending: _t.List[bytes] = []
+        try:
+            while True:
+                chunk = await stdout.read(_READ_SIZE)
+                if not chunk:
+                    break
+                lines = _split_chunk(pending, chunk)
+                for i in range(0, len(lines), n):
+                    batch = lines[i : i + n]
+                    yield batch if raw else list(map(json.loads, batch))
+
+            if pending:
+                line = b"".join(pending)
+                yield [line] if raw else [json.loads(line)]
+
+            returncode = await process.wait()
+            if returncode != 0:
+                raise BinaryExecutionException(
+                    await stderr or f"Process exited with code {returncode}"
+                )
+        finally:
+            # Reached early if the consumer stops iterating or a line fails
+            # to decode, in which case the binary is still running.
+            stderr.cancel()
+            if process.returncode is None:
+                self.kill_subprocess_proc()
+                await process.wait()
 
-class AsyncBinaryIterator:
-    def __init__(self, process_coro: Coroutine):
+
+class AsyncBinaryIterator(AsyncLineReaderMixin):
+    def __init__(self, process_coro: Coroutine, raw: bool = False):
         self.process_coro = process_coro
+        self.raw = raw
         self.process: asyncio.subprocess.Process | None = None
+        self._buf = bytearray()
+        self._stderr: _t.Optional[asyncio.Future] = None
 
     async def __aiter__(self):
         return self
 
-    async def __anext__(self) -> str:
+    async def __anext__(self) -> _t.Any:
+        # Lines already buffered are returned straight away. Starting the
+        # process and checking for the end of the output only happen when
+        # the buffer needs refilling.
+        output = _pop_line(self._buf)
+        if output is None:
+            output = await self._refill()
+
+        if self.raw:
+            return output
+        return json.loads(output)
+
+    async def _refill(self) -> bytes:
+        """Start the process if it hasn't been yet and return its next line,
+        raising `StopAsyncIteration` once its output is exhausted.
+        """
         if self.process is None:
             self.process = await _t.cast(
                 Awaitable[asyncio.subprocess.Process],
                 self.process_coro,
             )
-        output = await self.read_output(self.process)
-        await self.raise_err_if_stderr()
+            if self.process.stderr is not None:
+                self._stderr = asyncio.ensure_future(
+                    _drain_stderr(self.process.stderr)
+                )
+        output = None
+        if self.process.stdout is not None:
+            output = await _read_line(self.process.stdout, self._buf)
 
-        if not output:
+        if output is None:
+            await self.process.wait()
+            await self.raise_err_if_stderr()
             raise StopAsyncIteration
 
-        return json.loads(output)
-
-    async def read_output(self, process: asyncio.subprocess.Process) -> str:
-        if process.stdout is None:
-            return ""
-        line = await process.stdout.readline()
-        if not line:
-            return ""
-        return line.decode().rstrip()
+        return output
 
     async def raise_err_if_stderr(self):
-        if (
-            self.process.returncode is not None
-            and self.process.returncode != 0
-        ):
-            err = await self.process.stderr.read()
-            if err:
-                raise BinaryExecutionException(err)
-            else:
-                raise BinaryExecutionException(
-                    f"Process exited with code {self.process.returncode}"
-                )
+        returncode = self.process.returncode
+        if returncode is not None and returncode != 0:
+            err = await self._stderr if self._stderr is not None else ""
+            raise BinaryExecutionException(
+                err or f"Process exited with code {returncode}"
+            )
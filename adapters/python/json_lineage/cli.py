@@ -3,9 +3,21 @@ adapter.
 """
 
 import argparse
-import json
+import os
+import stat
+import sys
+import typing as _t
+from itertools import islice
 
-from .bin_interface import BinaryReader
+from .bin_interface import BinaryIterator, BinaryReader
+
+# Maximum number of bytes to move per `os.splice`/`os.write` call when
+# copying the binary's output to a file.
+_COPY_SIZE = 1 << 20
+# `os.splice` is only available on Linux with Python 3.10+.
+_HAS_SPLICE = hasattr(os, "splice")
+# Number of lines to join into a single write when printing to stdout.
+_PRINT_BATCH_SIZE = 256
 
 
 def parse_args() -> argparse.Namespace:
@@ -41,16 +53,82 @@ def parse_args() -> argparse.Namespace:
 
 
 def print_lines(reader: BinaryReader) -> None:
-    """Prints the lines from the given reader to stdout."""
-    for line in reader:
-        print(json.dumps(line))
+    """Prints the lines from the given reader to stdout. The lines are read
+    undecoded, whether or not the reader is `raw`, and written to the binary
+    stdout buffer in batches of `_PRINT_BATCH_SIZE` rather than printed one
+    at a time.
+    """
+    sys.stdout.flush()
+    # stdout may have been replaced by a text-only stream, e.g. by
+    # `contextlib.redirect_stdout`, in which case the lines are decoded.
+    buffer = getattr(sys.stdout, "buffer", None)
+    lines = BinaryIterator(reader.popen(), raw=True)
+    while True:
+        batch = list(islice(lines, _PRINT_BATCH_SIZE))
+        if not batch:
+            break
+        batch.append(b"")
+        if buffer is not None:
+            buffer.write(b"\n".join(batch))
+        else:
+            sys.stdout.write(b"\n".join(batch).decode())
+    sys.stdout.flush()
+
+
+def splice_output(src_fd: int, dst_fd: int) -> None:
+    """Moves everything from `src_fd` to `dst_fd` with `os.splice`, so that
+    the data never has to be copied into user space.
+    """
+    while os.splice(  # type: ignore[attr-defined]
+        src_fd, dst_fd, _COPY_SIZE
+    ):
+        pass
+
+
+def copy_output(src: _t.BinaryIO, dst_fd: int) -> None:
+    """Copies everything from the `src` stream to `dst_fd` in chunks."""
+    read = src.read1  # type: ignore[attr-defined]
+    while True:
+        chunk = read(_COPY_SIZE)
+        if not chunk:
+            break
+        # Pipes, sockets and terminals may accept only part of a chunk.
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view) :]
 
 
 def write_lines(reader: BinaryReader, filepath: str) -> None:
-    """Writes the lines from the given reader to the given filepath."""
-    with open(filepath, "w") as f:
-        for line in reader:
-            f.write(json.dumps(line) + "\n")
+    """Writes the lines from the given reader to the given filepath.
+
+    The binary already outputs JSONL, so its output is copied to the file as
+    is rather than being decoded and re-encoded line by line.
+    """
+    # The file is opened before the binary is started, so that a bad path
+    # doesn't leave the binary running.
+    fd = os.open(
+        filepath,
+        os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0),
+        0o666,
+    )
+    try:
+        lines = iter(reader)
+        stdout = _t.cast(_t.BinaryIO, lines.process.stdout)
+        if _HAS_SPLICE and stat.S_ISREG(os.fstat(fd).st_mode):
+            try:
+                splice_output(stdout.fileno(), fd)
+            except OSError:
+                # Not every filesystem supports splice (EINVAL). Anything
+                # already moved has advanced the file offset, so the copy
+                # carries on from where splice stopped.
+                copy_output(stdout, fd)
+        else:
+            copy_output(stdout, fd)
+    finally:
+        os.close(fd)
+
+    lines.process.wait()
+    lines.raise_err_if_stderr()
 
 
 def main() -> None:
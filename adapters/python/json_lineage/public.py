@@ -3,19 +3,42 @@ aim to mimic the `json` module in the Python standard library as much as
 possible for easy adoption.
 """
 
-from .bin_interface import AsyncBinaryReader, BinaryReader
+from .bin_interface import AsyncBinaryReader, BatchedBinaryReader, BinaryReader
 
 __all__ = [
     "load",
+    "load_batched",
     "aload",
 ]
 
 
-def load(fp: str, *, messy: bool = False) -> BinaryReader:
-    """Return a `BinaryReader` object for the given file path."""
-    return BinaryReader(fp, messy)
+def load(fp: str, *, messy: bool = False, raw: bool = False) -> BinaryReader:
+    """Return a `BinaryReader` object for the given file path. If `raw` is
+    set, the reader yields each line as `bytes` rather than decoding it.
+    """
+    return BinaryReader(fp, messy, raw=raw)
 
 
-def aload(fp: str, *, messy: bool = False) -> AsyncBinaryReader:
-    """Return an `AsyncBinaryReader` object for the given file path."""
-    return AsyncBinaryReader(fp, messy)
+def load_batched(
+    fp: str,
+    *,
+    batch_size: int = 1024,
+    messy: bool = False,
+    raw: bool = False,
+) -> BatchedBinaryReader:
+    """Return a `BatchedBinaryReader` object for the given file path, which
+    yields lists of up to `batch_size` objects at a time.
+    """
+    return BatchedBinaryReader(fp, messy, raw=raw, batch_size=batch_size)
+
+
+def aload(
+    fp: str,
+    *,
+    messy: bool = False,
+    raw: bool = False,
+) -> AsyncBinaryReader:
+    """Return an `AsyncBinaryReader` object for the given file path. If `raw`
+    is set, the reader yields each line as `bytes` rather than decoding it.
+    """
+    return AsyncBinaryReader(fp, messy, raw=raw)
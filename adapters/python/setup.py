@@ -1,3 +1,25 @@
-from setuptools import setup
+import os
+import sys
 
-setup()
\ No newline at end of file
+from setuptools import Extension, setup
+
+# The C line splitter is optional, `bin_interface` falls back to a pure
+# Python implementation when it is not built. It is only built when asked
+# for, so that the release wheel stays pure Python and keeps covering every
+# platform the bundled binaries support.
+if os.environ.get("JSON_LINEAGE_BUILD_EXT") == "1":
+    from Cython.Build import cythonize
+
+    ext_modules = cythonize(
+        [
+            Extension(
+                "json_lineage._fastline",
+                ["json_lineage/_fastline.pyx"],
+                extra_compile_args=[] if sys.platform == "win32" else ["-O3"],
+            )
+        ]
+    )
+else:
+    ext_modules = []
+
+setup(ext_modules=ext_modules)
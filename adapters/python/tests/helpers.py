@@ -1,3 +1,4 @@
+import io
 import os
 
 SAMPLE_DATA_PATH = os.path.realpath(
@@ -11,3 +12,31 @@ SAMPLE_DATA_PATH = os.path.realpath(
         "sample.json",
     )
 )
+
+# What the binary writes to stdout for `SAMPLE_DATA_PATH`.
+SAMPLE_OUTPUT = b'{"a": {"B": 1},"b": 2}\n{"a": 1,"b": 2}\n'
+
+
+class FakeProc:
+    """Stand-in for a `subprocess.Popen` object whose process has already
+    exited, for tests that don't need to run the binary.
+    """
+
+    def __init__(
+        self,
+        stdout: bytes = b"",
+        stderr: bytes = b"",
+        returncode: int = 0,
+    ):
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+        self.returncode = returncode
+
+    def poll(self) -> int:
+        return self.returncode
+
+    def wait(self) -> int:
+        return self.returncode
+
+    def terminate(self) -> None:
+        pass
@@ -1,17 +1,29 @@
 import asyncio
-import platform
+import io
+import pathlib
 import subprocess
+import sys
 import time
 from types import SimpleNamespace
-from typing import Callable, Union
-from unittest import IsolatedAsyncioTestCase, TestCase
-from unittest.mock import patch
+from typing import Any, Callable, List, Union
+from unittest import IsolatedAsyncioTestCase, TestCase, skipUnless
+from unittest.mock import MagicMock, patch
 
 from json_lineage import bin_interface
 from json_lineage.bin_interface import get_bin_path
 from json_lineage.exceptions import BinaryExecutionException
 
-from .helpers import SAMPLE_DATA_PATH
+from .helpers import SAMPLE_DATA_PATH, SAMPLE_OUTPUT, FakeProc
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    from json_lineage import _fastline
+except ImportError:  # The extension hasn't been built.
+    _fastline = None  # type: ignore[assignment]
 
 
 class ReaderInstanceMixin:
@@ -29,8 +41,14 @@ class ReaderInstanceMixin:
 class TestGetBinPath(TestCase):
     """Tests for the `get_bin_path` function."""
 
-    @patch.object(platform, "system", return_value="Windows")
-    def test_get_bin_path_as_windows(self, _):
+    def setUp(self):
+        # `get_bin_path` is cached, so the cache is cleared around each test
+        # for the patched platform to take effect and not leak.
+        get_bin_path.cache_clear()
+        self.addCleanup(get_bin_path.cache_clear)
+
+    @patch.object(sys, "platform", "win32")
+    def test_get_bin_path_as_windows(self):
         """Test that the `get_bin_path` function returns the correct path on
         Windows.
         """
@@ -38,8 +56,8 @@ class TestGetBinPath(TestCase):
             bin_interface.get_bin_path().endswith("jsonl_converter.exe"),
         )
 
-    @patch.object(platform, "system", return_value="Linux")
-    def test_get_bin_path_as_linux(self, _):
+    @patch.object(sys, "platform", "linux")
+    def test_get_bin_path_as_linux(self):
         """Test that the `get_bin_path` function returns the correct path on
         Linux.
         """
@@ -84,6 +102,13 @@ class TestBaseBinaryReader(TestCase):
         reader = bin_interface.BinaryReader("filename")
         self.assertEqual(reader.bin_args(), [get_bin_path(), "filename"])
 
+    def test_bin_args_with_path_like_filename(self):
+        """Test that the `bin_args` method passes a path-like filename to the
+        binary as a string.
+        """
+        reader = bin_interface.BinaryReader(pathlib.Path("filename"))
+        self.assertEqual(reader.bin_args(), [get_bin_path(), "filename"])
+
     def test_bin_with_messy_opt(self):
         """Test that the `bin_args` method returns the correct arguments when
         the `messy` option is passed.
@@ -101,45 +126,107 @@ class TestBinaryReader(ReaderInstanceMixin, TestCase):
     def create_reader_instance():
         return bin_interface.BinaryReader(SAMPLE_DATA_PATH)
 
+    def patch_popen(self, proc: FakeProc) -> MagicMock:
+        """Make `subprocess.Popen` return `proc` for the rest of the test
+        rather than running the binary.
+        """
+        patcher = patch.object(subprocess, "Popen", return_value=proc)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def reap_on_cleanup(self, proc: subprocess.Popen) -> None:
+        """Close the pipes of `proc` and wait for it to exit once the test
+        is done, without reading whatever output is left.
+        """
+
+        def reap():
+            proc.stdout.close()
+            proc.stderr.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+        self.addCleanup(reap)
+
     def test_popen_returns_popen(self):
-        """Test that the `popen` method returns a `subprocess.Popen` object."""
+        """Test that the `popen` method returns the `subprocess.Popen` object
+        running the binary.
+        """
+        proc = FakeProc(SAMPLE_OUTPUT)
+        popen = self.patch_popen(proc)
+        self.assertIs(self.reader.popen(), proc)
+        self.assertEqual(popen.call_args.args[0], self.reader.bin_args())
+
+    @skipUnless(
+        bin_interface._F_SETPIPE_SZ is not None,
+        "pipe sizes can only be changed on Linux",
+    )
+    def test_popen_grows_pipes(self):
+        """Test that the `popen` method enlarges the stdout and stderr pipes
+        to `_PIPE_BUFSIZE`.
+        """
+        with open("/proc/sys/fs/pipe-max-size") as f:
+            if int(f.read()) < bin_interface._PIPE_BUFSIZE:
+                self.skipTest("pipe-max-size is below _PIPE_BUFSIZE")
+
         proc = self.reader.popen()
-        self.assertIsInstance(proc, subprocess.Popen)
-        proc.communicate()
+        self.reap_on_cleanup(proc)
+        f_getpipe_sz = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+        for stream in (proc.stdout, proc.stderr):
+            self.assertEqual(
+                fcntl.fcntl(stream.fileno(), f_getpipe_sz),
+                bin_interface._PIPE_BUFSIZE,
+            )
 
     def test_ppopen_readable_stdout(self):
-        """Test that the `popen` method returns a `subprocess.Popen` object
-        with a readable stdout.
+        """Test that the `popen` method runs the binary and returns a
+        `subprocess.Popen` object with a readable stdout.
         """
         proc = self.reader.popen()
-        self.assertIsNotNone(proc.stdout.readline())
-        proc.communicate()
+        self.reap_on_cleanup(proc)
+        self.assertIsInstance(proc, subprocess.Popen)
+        self.assertEqual(proc.stdout.read(), SAMPLE_OUTPUT)
 
     def test_iter(self):
         """Test that the `__iter__` method returns a `BinaryIterator`
         object.
         """
+        self.patch_popen(FakeProc(SAMPLE_OUTPUT))
         self.assertIsInstance(iter(self.reader), bin_interface.BinaryIterator)
-        self.reader._proc.communicate()
 
     def test_iter_next_valid(self):
         """Test that the `__next__` method iterates over the binary stdout
         correctly.
         """
+        self.patch_popen(FakeProc(SAMPLE_OUTPUT))
         iterator = iter(self.reader)
         self.assertEqual(next(iterator), {"a": {"B": 1}, "b": 2})
         self.assertEqual(next(iterator), {"a": 1, "b": 2})
         with self.assertRaises(StopIteration):
             next(iterator)
 
+    def test_iter_next_raw(self):
+        """Test that the `__next__` method returns the lines as `bytes` when
+        the reader is created with `raw` set.
+        """
+        self.patch_popen(FakeProc(SAMPLE_OUTPUT))
+        reader = bin_interface.BinaryReader(SAMPLE_DATA_PATH, raw=True)
+        self.assertEqual(
+            list(reader),
+            [b'{"a": {"B": 1},"b": 2}', b'{"a": 1,"b": 2}'],
+        )
+        reader.kill_subprocess_proc()
+
     def test_raises_err_if_non_0_return_code_with_stderr_from_bin(self):
         """Test that the `__next__` method raises a `BinaryExecutionException`
         if the binary returns a non-zero return code and there is stderr from
         the binary.
         """
+        self.patch_popen(FakeProc(stderr=b"panicked\n", returncode=101))
         reader = bin_interface.BinaryReader("invalid_path")
-        with self.assertRaises(BinaryExecutionException):
+        with self.assertRaises(BinaryExecutionException) as ctx:
             next(iter(reader))
+        self.assertEqual(ctx.exception.args[0], "panicked\n")
         reader.kill_subprocess_proc()
 
     def test_raises_err_if_non_0_return_code_no_stderr_from_bin(self):
@@ -147,12 +234,127 @@ class TestBinaryReader(ReaderInstanceMixin, TestCase):
         if the binary returns a non-zero return code and there is no stderr
         from the binary.
         """
+        self.patch_popen(FakeProc(returncode=101))
         reader = bin_interface.BinaryReader("invalid_path")
-        with self.assertRaises(BinaryExecutionException):
+        with self.assertRaisesRegex(BinaryExecutionException, "code 101"):
             next(iter(reader))
         reader.kill_subprocess_proc()
 
 
+class TestBatchedBinaryReader(TestCase):
+    """Tests for the `BatchedBinaryReader` class."""
+
+    def test_iter_yields_batches(self):
+        """Test that iterating yields lists of at most `batch_size`
+        objects.
+        """
+        reader = bin_interface.BatchedBinaryReader(
+            SAMPLE_DATA_PATH,
+            batch_size=1,
+        )
+        self.assertEqual(
+            list(reader),
+            [[{"a": {"B": 1}, "b": 2}], [{"a": 1, "b": 2}]],
+        )
+        reader.kill_subprocess_proc()
+
+    def test_iter_yields_single_partial_batch(self):
+        """Test that a batch larger than the output yields one batch."""
+        reader = bin_interface.BatchedBinaryReader(SAMPLE_DATA_PATH)
+        self.assertEqual(
+            list(reader),
+            [[{"a": {"B": 1}, "b": 2}, {"a": 1, "b": 2}]],
+        )
+        reader.kill_subprocess_proc()
+
+    def test_iter_raw(self):
+        """Test that the batches contain `bytes` when `raw` is set."""
+        reader = bin_interface.BatchedBinaryReader(
+            SAMPLE_DATA_PATH,
+            raw=True,
+            batch_size=2,
+        )
+        self.assertEqual(
+            list(reader),
+            [[b'{"a": {"B": 1},"b": 2}', b'{"a": 1,"b": 2}']],
+        )
+        reader.kill_subprocess_proc()
+
+    def test__init__rejects_batch_size_below_1(self):
+        """Test that a `batch_size` below 1 raises a `ValueError`."""
+        for batch_size in (0, -1):
+            with self.subTest(batch_size=batch_size):
+                with self.assertRaises(ValueError):
+                    bin_interface.BatchedBinaryReader(
+                        SAMPLE_DATA_PATH,
+                        batch_size=batch_size,
+                    )
+
+    def test_iter_raises_err_if_non_0_return_code(self):
+        """Test that iterating raises a `BinaryExecutionException` if the
+        binary returns a non-zero return code.
+        """
+        reader = bin_interface.BatchedBinaryReader("invalid_path")
+        with self.assertRaises(BinaryExecutionException):
+            list(reader)
+        reader.kill_subprocess_proc()
+
+
+class LineReaderTestsMixin:
+    """Tests shared by both implementations of the line reader."""
+
+    line_reader: Callable[[io.BytesIO], Any]
+
+    def read_lines(self, data: bytes) -> List[bytes]:
+        reader = self.line_reader(io.BytesIO(data))
+        return list(iter(reader.next_line, None))
+
+    def test_next_line_splits_lines(self):
+        """Test that the `next_line` method returns each line without its
+        line ending.
+        """
+        self.assertEqual(self.read_lines(b"a\nbc\n"), [b"a", b"bc"])
+
+    def test_next_line_returns_line_longer_than_a_read(self):
+        """Test that the `next_line` method returns lines which span more
+        than one read from the stream.
+        """
+        line = b"x" * (3 * bin_interface._READ_SIZE + 1)
+        self.assertEqual(self.read_lines(line + b"\ny\n"), [line, b"y"])
+
+    def test_next_line_returns_multi_megabyte_line(self):
+        """Test that the `next_line` method returns a line spanning a large
+        number of reads.
+        """
+        line = bytes(range(10)) * (1 << 20)
+        self.assertEqual(self.read_lines(b"a\n" + line), [b"a", line])
+
+    def test_next_line_returns_last_line_without_line_ending(self):
+        """Test that the `next_line` method returns the last line even if
+        the stream doesn't end with a line ending.
+        """
+        self.assertEqual(self.read_lines(b"a\nb"), [b"a", b"b"])
+
+    def test_next_line_returns_none_for_empty_stream(self):
+        """Test that the `next_line` method returns `None` straight away for
+        an empty stream.
+        """
+        self.assertEqual(self.read_lines(b""), [])
+
+
+class TestPyLineReader(LineReaderTestsMixin, TestCase):
+    """Tests for the pure Python `_LineReader` class."""
+
+    line_reader = bin_interface._LineReader
+
+
+@skipUnless(_fastline is not None, "_fastline has not been built")
+class TestFastLineReader(LineReaderTestsMixin, TestCase):
+    """Tests for the Cython `_fastline.LineReader` class."""
+
+    line_reader = getattr(_fastline, "LineReader", None)  # type: ignore
+
+
 class TestBinaryIterator(TestCase):
     """Tests for the `BinaryIterator` class."""
 
@@ -171,6 +373,60 @@ class TestBinaryIterator(TestCase):
         with self.assertRaises(StopIteration):
             next(iterator)
 
+    def test__next__drains_stderr_while_reading_stdout(self):
+        """Test that a process writing more to stderr than a pipe can hold
+        does not block iteration, and that its stderr is reported once it
+        fails.
+        """
+        script = (
+            "import sys\n"
+            "sys.stderr.write('x' * (1 << 20))\n"
+            "print('{\"a\": 1}')\n"
+            "sys.exit(1)\n"
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        iterator = bin_interface.BinaryIterator(proc)
+        self.assertEqual(next(iterator), {"a": 1})
+        with self.assertRaises(BinaryExecutionException) as ctx:
+            next(iterator)
+        self.assertEqual(
+            len(ctx.exception.args[0]),
+            bin_interface._STDERR_LIMIT,
+        )
+        proc.stdout.close()
+        proc.stderr.close()
+
+    def test_raise_err_if_stderr_uses_exit_code_without_stderr(self):
+        """Test that the `raise_err_if_stderr` method reports the exit code
+        if there is no stderr from the binary.
+        """
+        iterator = bin_interface.BinaryIterator(
+            SimpleNamespace(stdout=None, stderr=None, poll=lambda: 3)
+        )
+        with self.assertRaisesRegex(BinaryExecutionException, "code 3"):
+            iterator.raise_err_if_stderr()
+
+
+class TestReadLine(IsolatedAsyncioTestCase):
+    """Tests for the `_read_line` function."""
+
+    async def test_read_line_returns_line_spanning_many_reads(self):
+        """Test that lines spanning many reads from the stream are returned
+        whole, followed by the lines after them.
+        """
+        line = b"x" * (8 << 20)
+        stream = asyncio.StreamReader()
+        stream.feed_data(line + b"\ny")
+        stream.feed_eof()
+        buf = bytearray()
+        self.assertEqual(await bin_interface._read_line(stream, buf), line)
+        self.assertEqual(await bin_interface._read_line(stream, buf), b"y")
+        self.assertIsNone(await bin_interface._read_line(stream, buf))
+
 
 class TestAsyncBinaryReader(ReaderInstanceMixin, IsolatedAsyncioTestCase):
     """Tests for the `AsyncBinaryReader` class."""
@@ -193,9 +449,10 @@ class TestAsyncBinaryReader(ReaderInstanceMixin, IsolatedAsyncioTestCase):
 
         async def fn():
             reader = bin_interface.AsyncBinaryReader("invalid_path")
-            with self.assertRaises(BinaryExecutionException):
+            with self.assertRaises(BinaryExecutionException) as ctx:
                 async for _ in reader:
                     pass
+            self.assertIn("panicked", ctx.exception.args[0])
 
         await asyncio.wait_for(fn(), timeout=0.1)
 
@@ -218,6 +475,77 @@ class TestAsyncBinaryReader(ReaderInstanceMixin, IsolatedAsyncioTestCase):
         with self.assertRaises(StopAsyncIteration):
             await iterator.__anext__()
 
+    async def test_batched_yields_lines_per_read(self):
+        """Test that the `batched` method yields all the lines from a single
+        read of the binary's stdout in one batch.
+        """
+        batches = self.reader.batched()
+        self.assertEqual(
+            await batches.__anext__(),
+            [{"a": {"B": 1}, "b": 2}, {"a": 1, "b": 2}],
+        )
+        with self.assertRaises(StopAsyncIteration):
+            await batches.__anext__()
+
+    async def test_batched_limits_batch_size(self):
+        """Test that the `batched` method yields at most `n` objects per
+        batch.
+        """
+        reader = bin_interface.AsyncBinaryReader(SAMPLE_DATA_PATH, raw=True)
+        self.assertEqual(
+            [batch async for batch in reader.batched(1)],
+            [[b'{"a": {"B": 1},"b": 2}'], [b'{"a": 1,"b": 2}']],
+        )
+        reader.kill_subprocess_proc()
+
+    async def test_batched_rejects_n_below_1(self):
+        """Test that the `batched` method raises a `ValueError` for an `n`
+        below 1 without starting the binary.
+        """
+        for n in (0, -1):
+            with self.subTest(n=n):
+                with self.assertRaises(ValueError):
+                    self.reader.batched(n)
+                self.assertIsNone(self.reader._proc)
+
+    async def test_batched_cleans_up_if_stopped_early(self):
+        """Test that the `batched` method stops the binary and its stderr
+        reader if iteration stops before the output is exhausted.
+        """
+        batches = self.reader.batched(1)
+        await batches.__anext__()
+        process = self.reader._proc
+        await batches.aclose()
+        await asyncio.sleep(0)
+        self.assertIsNotNone(process.returncode)
+        self.assertEqual(
+            [t for t in asyncio.all_tasks() if "_drain_stderr" in repr(t)],
+            [],
+        )
+
+    async def test_batched_raises_err_if_non_0_return_code(self):
+        """Test that the `batched` method raises a
+        `BinaryExecutionException` if the binary returns a non-zero return
+        code.
+        """
+        reader = bin_interface.AsyncBinaryReader("invalid_path")
+        with self.assertRaises(BinaryExecutionException) as ctx:
+            async for _ in reader.batched():
+                pass
+        self.assertIn("panicked", ctx.exception.args[0])
+        reader.kill_subprocess_proc()
+
+    async def test__anext__raw(self):
+        """Test that the `__anext__` method returns the lines as `bytes` when
+        the reader is created with `raw` set.
+        """
+        reader = bin_interface.AsyncBinaryReader(SAMPLE_DATA_PATH, raw=True)
+        self.assertEqual(
+            [line async for line in reader],
+            [b'{"a": {"B": 1},"b": 2}', b'{"a": 1,"b": 2}'],
+        )
+        reader.kill_subprocess_proc()
+
 
 class TestAsyncBinaryIterator(ReaderInstanceMixin, IsolatedAsyncioTestCase):
     """Tests for the `AsyncBinaryIterator` class."""
@@ -258,3 +586,20 @@ class TestAsyncBinaryIterator(ReaderInstanceMixin, IsolatedAsyncioTestCase):
         """Test that the `__aiter__` method returns an instance of itself."""
         iterator = bin_interface.AsyncBinaryIterator(None)
         self.assertIs(await iterator.__aiter__(), iterator)
+
+    async def test__anext__returns_empty_lines(self):
+        """Test that empty lines are returned as lines rather than ending
+        iteration, whether or not they were already buffered.
+        """
+        process = asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            "import sys; sys.stdout.write('\\n1\\n\\n2\\n')",
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        iterator = bin_interface.AsyncBinaryIterator(process, raw=True)
+        for line in (b"", b"1", b"", b"2"):
+            self.assertEqual(await iterator.__anext__(), line)
+        with self.assertRaises(StopAsyncIteration):
+            await iterator.__anext__()
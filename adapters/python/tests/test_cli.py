@@ -1,4 +1,8 @@
-import builtins
+import contextlib
+import errno
+import io
+import os
+import subprocess
 import sys
 import tempfile
 from unittest import TestCase
@@ -6,8 +10,9 @@ from unittest.mock import patch
 
 from json_lineage import cli
 from json_lineage.bin_interface import BinaryReader
+from json_lineage.exceptions import BinaryExecutionException
 
-from .helpers import SAMPLE_DATA_PATH
+from .helpers import SAMPLE_DATA_PATH, SAMPLE_OUTPUT, FakeProc
 
 
 class TestParseArgs(TestCase):
@@ -29,11 +34,42 @@ class TestPrintLines(TestCase):
         given reader to stdout.
         """
         reader = BinaryReader(SAMPLE_DATA_PATH)
-        with patch.object(builtins, "print") as mock_print:
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with patch.object(sys, "stdout", stdout):
             cli.print_lines(reader)
-            self.assertEqual(mock_print.call_count, 2)
+        self.assertEqual(
+            stdout.buffer.getvalue(),
+            b'{"a": {"B": 1},"b": 2}\n{"a": 1,"b": 2}\n',
+        )
         reader.kill_subprocess_proc()
 
+    def test_print_lines_in_batches(self):
+        """Test that the `print_lines` function writes the lines in batches
+        of `_PRINT_BATCH_SIZE`.
+        """
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with patch.object(
+            subprocess, "Popen", return_value=FakeProc(b"1\n2\n3\n")
+        ), patch.object(sys, "stdout", stdout), patch.object(
+            cli, "_PRINT_BATCH_SIZE", 2
+        ), patch.object(stdout.buffer, "write") as mock_write:
+            cli.print_lines(BinaryReader(SAMPLE_DATA_PATH))
+        self.assertEqual(
+            [c.args[0] for c in mock_write.call_args_list],
+            [b"1\n2\n", b"3\n"],
+        )
+
+    def test_print_lines_to_text_stream(self):
+        """Test that the `print_lines` function decodes the lines when stdout
+        has no binary buffer.
+        """
+        stdout = io.StringIO()
+        with patch.object(
+            subprocess, "Popen", return_value=FakeProc(SAMPLE_OUTPUT)
+        ), contextlib.redirect_stdout(stdout):
+            cli.print_lines(BinaryReader(SAMPLE_DATA_PATH))
+        self.assertEqual(stdout.getvalue(), SAMPLE_OUTPUT.decode())
+
     def test_write_lines(self):
         """Test that the `write_lines` function writes the lines from the
         given reader to the given filepath.
@@ -44,6 +80,73 @@ class TestPrintLines(TestCase):
             self.assertEqual(f.read().count(b"\n"), 2)
         reader.kill_subprocess_proc()
 
+    def test_write_lines_without_splice(self):
+        """Test that the `write_lines` function copies the output when
+        `os.splice` is not available.
+        """
+        reader = BinaryReader(SAMPLE_DATA_PATH)
+        with tempfile.NamedTemporaryFile() as f, patch.object(
+            cli, "splice_output"
+        ) as mock_splice, patch.object(cli, "_HAS_SPLICE", False):
+            cli.write_lines(reader, f.name)
+            self.assertEqual(
+                f.read(),
+                b'{"a": {"B": 1},"b": 2}\n{"a": 1,"b": 2}\n',
+            )
+            mock_splice.assert_not_called()
+        reader.kill_subprocess_proc()
+
+    def test_write_lines_falls_back_if_splice_fails(self):
+        """Test that the `write_lines` function copies the output when
+        `os.splice` is not supported for the file.
+        """
+        reader = BinaryReader(SAMPLE_DATA_PATH)
+        with tempfile.NamedTemporaryFile() as f, patch.object(
+            cli, "splice_output", side_effect=OSError(errno.EINVAL, "")
+        ), patch.object(cli, "_HAS_SPLICE", True):
+            cli.write_lines(reader, f.name)
+            self.assertEqual(
+                f.read(),
+                b'{"a": {"B": 1},"b": 2}\n{"a": 1,"b": 2}\n',
+            )
+        reader.kill_subprocess_proc()
+
+    def test_copy_output_retries_short_writes(self):
+        """Test that the `copy_output` function keeps writing until each
+        chunk has been written in full.
+        """
+        written = []
+
+        def short_write(fd, data):
+            written.append(bytes(data[:3]))
+            return len(written[-1])
+
+        with patch.object(cli.os, "write", side_effect=short_write):
+            cli.copy_output(io.BytesIO(b"abcdefgh"), 1)
+        self.assertEqual(b"".join(written), b"abcdefgh")
+
+    def test_write_lines_to_bad_path_does_not_start_bin(self):
+        """Test that the `write_lines` function doesn't start the binary if
+        the output file can't be opened.
+        """
+        reader = BinaryReader(SAMPLE_DATA_PATH)
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(
+            subprocess, "Popen"
+        ) as mock_popen:
+            with self.assertRaises(FileNotFoundError):
+                cli.write_lines(reader, os.path.join(tmp_dir, "a", "b"))
+        mock_popen.assert_not_called()
+
+    def test_write_lines_raises_err_if_bin_fails(self):
+        """Test that the `write_lines` function raises a
+        `BinaryExecutionException` if the binary fails.
+        """
+        reader = BinaryReader("invalid_path")
+        with tempfile.NamedTemporaryFile() as f:
+            with self.assertRaises(BinaryExecutionException):
+                cli.write_lines(reader, f.name)
+        reader.kill_subprocess_proc()
+
 
 class TestMain(TestCase):
     """Tests for the `main` function."""
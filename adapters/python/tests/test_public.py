@@ -1,7 +1,8 @@
 from unittest import TestCase
 
-from json_lineage import aload, load
-from json_lineage.bin_interface import AsyncBinaryReader, BinaryReader
+from json_lineage import aload, load, load_batched
+from json_lineage.bin_interface import (AsyncBinaryReader, BatchedBinaryReader,
+                                        BinaryReader)
 
 
 class TestPublic(TestCase):
@@ -11,6 +12,20 @@ class TestPublic(TestCase):
         """Test that `load` returns a `BinaryReader` object."""
         self.assertIsInstance(load("foo"), BinaryReader)
 
+    def test_load_batched_returns_batched_binary_reader(self):
+        """Test that `load_batched` returns a `BatchedBinaryReader` object."""
+        reader = load_batched("foo", batch_size=10)
+        self.assertIsInstance(reader, BatchedBinaryReader)
+        self.assertEqual(reader.batch_size, 10)
+
     def test_aload_returns_async_binary_reader(self):
         """Test that `aload` returns an `AsyncBinaryReader` object."""
         self.assertIsInstance(aload("foo"), AsyncBinaryReader)
+
+    def test_load_passes_raw_to_reader(self):
+        """Test that `load` passes the `raw` flag to the reader."""
+        self.assertTrue(load("foo", raw=True).raw)
+
+    def test_aload_passes_raw_to_reader(self):
+        """Test that `aload` passes the `raw` flag to the reader."""
+        self.assertTrue(aload("foo", raw=True).raw)
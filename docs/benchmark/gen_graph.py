@@ -4,24 +4,56 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import namedtuple
 
+# The columns of `data.csv` that the charts are drawn from.
+CSV_DTYPES = {
+    "Size (MB)": np.float64,
+    "json time (s)": np.float64,
+    "json_lineage time (s)": np.float64,
+    "json memory (MB)": np.float64,
+    "json_lineage memory (MB)": np.float64,
+}
+
+Datasets = namedtuple(
+    "Datasets",
+    [
+        "sizes",
+        "json_dataset",
+        "lineage_dataset",
+        "line_of_best_fit_json",
+        "line_of_best_fit_lineage",
+    ],
+)
+
+
+def linear_fit(x, y):
+    """Return the `(slope, intercept)` of the least squares line through
+    `x` and `y`. Equivalent to `np.polyfit(x, y, 1)` without going through
+    a full least squares solver.
+    """
+    x_mean = x.mean()
+    y_mean = y.mean()
+    x_dev = x - x_mean
+    slope = np.dot(x_dev, y - y_mean) / np.dot(x_dev, x_dev)
+    return slope, y_mean - slope * x_mean
+
+
+def linear_val(coef, x):
+    """Evaluate the line returned by `linear_fit` at `x`."""
+    return coef[0] * x + coef[1]
+
 
 def prep_datasets(sizes, json_dataset, lineage_dataset):
-    regression_json = np.polyfit(sizes, json_dataset, 1)
-    regression_lineage = np.polyfit(sizes, lineage_dataset, 1)
-
-    line_of_best_fit_json = np.polyval(regression_json, sizes)
-    line_of_best_fit_lineage = np.polyval(regression_lineage, sizes)
-
-    return namedtuple(
-        "Datasets",
-        [
-            "sizes",
-            "json_dataset",
-            "lineage_dataset",
-            "line_of_best_fit_json",
-            "line_of_best_fit_lineage",
-        ],
-    )(
+    sizes = np.asarray(sizes, dtype=np.float64)
+    json_dataset = np.asarray(json_dataset, dtype=np.float64)
+    lineage_dataset = np.asarray(lineage_dataset, dtype=np.float64)
+
+    regression_json = linear_fit(sizes, json_dataset)
+    regression_lineage = linear_fit(sizes, lineage_dataset)
+
+    line_of_best_fit_json = linear_val(regression_json, sizes)
+    line_of_best_fit_lineage = linear_val(regression_lineage, sizes)
+
+    return Datasets(
         sizes,
         json_dataset,
         lineage_dataset,
@@ -30,75 +62,88 @@ def prep_datasets(sizes, json_dataset, lineage_dataset):
     )
 
 
-def create_time_diff_chart(df):
+def create_time_diff_chart(df, fig, subfig):
     dataset = prep_datasets(
         df["Size (MB)"],
         df["json time (s)"],
         df["json_lineage time (s)"],
     )
-    plt = create_chart(
-        dataset, "Time Difference Between JSON and JSON Lineage", "Time (s)"
+    create_chart(
+        subfig.subplots(),
+        dataset,
+        "Time Difference Between JSON and JSON Lineage",
+        "Time (s)",
     )
-    plt.savefig("time_diff_chart.png")
+    save_chart(fig, subfig, "time_diff_chart.png")
 
 
-def create_mem_diff_chart(df):
+def create_mem_diff_chart(df, fig, subfig):
     dataset = prep_datasets(
         df["Size (MB)"],
         df["json memory (MB)"],
         df["json_lineage memory (MB)"],
     )
-    plt = create_chart(
+    create_chart(
+        subfig.subplots(),
         dataset,
         "Memory Difference Between JSON and JSON Lineage",
         "Memory (MB)",
     )
-    plt.savefig("mem_diff_chart.png")
-
-
-def create_chart(dataset, title, y_label):
-    # Calculate the lines of best fit
-    regression_json = np.polyfit(dataset.sizes, dataset.json_dataset, 1)
-    regression_lineage = np.polyfit(dataset.sizes, dataset.lineage_dataset, 1)
+    save_chart(fig, subfig, "mem_diff_chart.png")
 
-    line_of_best_fit_json = np.polyval(regression_json, dataset.sizes)
-    line_of_best_fit_lineage = np.polyval(regression_lineage, dataset.sizes)
 
+def create_chart(ax, dataset, title, y_label):
     # Create the scatter plot
-    plt.figure(figsize=(8, 6))
-    sns.scatterplot(x=dataset.sizes, y=dataset.json_dataset, label="JSON Time")
-    plt.plot(
+    sns.scatterplot(
+        x=dataset.sizes, y=dataset.json_dataset, label="JSON Time", ax=ax
+    )
+    ax.plot(
         dataset.sizes,
-        line_of_best_fit_json,
+        dataset.line_of_best_fit_json,
         label="JSON (Line of Best Fit)",
         color="#3571A3",
     )
     sns.scatterplot(
-        x=dataset.sizes, y=dataset.lineage_dataset, label="JSON Lineage"
+        x=dataset.sizes, y=dataset.lineage_dataset, label="JSON Lineage", ax=ax
     )
-    plt.plot(
+    ax.plot(
         dataset.sizes,
-        line_of_best_fit_lineage,
+        dataset.line_of_best_fit_lineage,
         label="JSON Lineage (Line of Best Fit)",
         color="#f57f00",
     )
 
     # Set labels and title
-    plt.xlabel("Size (MB)")
-    plt.ylabel(y_label)
-    plt.title(title)
+    ax.set_xlabel("Size (MB)")
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
 
     # Add legend
-    plt.legend()
+    ax.legend()
 
-    # Save the plot as a PNG file
-    return plt
+
+def save_chart(fig, subfig, filename):
+    """Save just the area of `fig` covered by `subfig` as a PNG file."""
+    fig.savefig(
+        filename,
+        bbox_inches=subfig.bbox.transformed(fig.dpi_scale_trans.inverted()),
+    )
 
 
 def main():
-    df = pd.read_csv("data.csv")
-    create_time_diff_chart(df)
-    create_mem_diff_chart(df)
+    df = pd.read_csv(
+        "data.csv",
+        engine="c",
+        usecols=list(CSV_DTYPES),
+        dtype=CSV_DTYPES,
+    )
+    # Both charts share a single figure so that matplotlib and seaborn only
+    # have to be set up once. Each chart is drawn in its own 8x6 subfigure
+    # and saved on its own.
+    fig = plt.figure(figsize=(16, 6))
+    time_fig, mem_fig = fig.subfigures(1, 2)
+    create_time_diff_chart(df, fig, time_fig)
+    create_mem_diff_chart(df, fig, mem_fig)
 
 
 if __name__ == "__main__":